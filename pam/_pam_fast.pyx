@@ -0,0 +1,184 @@
+# cython: language_level=3
+'''
+Optional compiled fast path for python-pam
+
+Runs a complete pam_start() ... pam_end() transaction in C, so none of the
+libpam calls pay for ctypes argument marshalling.  pam.internals falls back
+to the pure ctypes implementation when this extension isn't built.
+'''
+
+from libc.stdlib cimport calloc
+from libc.stdlib cimport free
+from libc.stdlib cimport malloc
+from libc.string cimport memcpy
+
+__all__ = ['authenticate']
+
+
+# plain C structs instead of the ctypes Structure wrappers of pam.internals,
+# every field access is a direct member load
+cdef extern from "security/_pam_types.h" nogil:
+    ctypedef struct pam_handle_t:
+        pass
+
+    struct pam_message:
+        int msg_style
+        const char *msg
+
+    struct pam_response:
+        char *resp
+        int resp_retcode
+
+    struct pam_conv:
+        int (*conv)(int, const pam_message **, pam_response **, void *)
+        void *appdata_ptr
+
+    int PAM_SUCCESS
+    int PAM_BUF_ERR
+    int PAM_CONV_ERR
+    int PAM_PROMPT_ECHO_OFF
+    int PAM_REINITIALIZE_CRED
+    int PAM_TTY
+    int PAM_XDISPLAY
+
+    int pam_set_item(pam_handle_t *pamh, int item_type, const void *item)
+    const char *pam_strerror(pam_handle_t *pamh, int errnum)
+
+
+cdef extern from "security/pam_appl.h" nogil:
+    int pam_start(const char *service_name, const char *user,
+                  const pam_conv *pam_conversation, pam_handle_t **pamh)
+    int pam_end(pam_handle_t *pamh, int pam_status)
+    int pam_authenticate(pam_handle_t *pamh, int flags)
+    int pam_acct_mgmt(pam_handle_t *pamh, int flags)
+    int pam_setcred(pam_handle_t *pamh, int flags)
+
+
+cdef struct conv_data:
+    const char *password
+    size_t length
+    void *messages
+
+
+cdef void _free_responses(pam_response *response, int n_messages) noexcept:
+    """release a response array that is not handed over to PAM
+
+    PAM doesn't free the responses of a failed conversation, so the
+    password copies made so far have to be released here.
+    """
+    cdef int i
+
+    for i in range(n_messages):
+        free(response[i].resp)
+    free(response)
+
+
+cdef int _conv_cb(int n_messages, const pam_message **messages,
+                  pam_response **p_response,
+                  void *app_data) noexcept with gil:
+    """Simple conversation function that responds to any
+       prompt where the echo is off with the supplied password
+
+    PAM calls this while the GIL is released, it is taken back here as the
+    messages are stored in a python list.
+    """
+    cdef conv_data *data = <conv_data *>app_data
+    cdef const pam_message *message
+    cdef pam_response *response
+    cdef char *dst
+    cdef int i
+
+    # PAM frees the array and every non-NULL resp, so it has to be zeroed
+    response = <pam_response *>calloc(n_messages, sizeof(pam_response))
+    if response is NULL:
+        return PAM_BUF_ERR
+
+    try:
+        for i in range(n_messages):
+            message = messages[i]
+
+            if message.msg is not NULL:
+                (<list>data.messages).append(<bytes>message.msg)
+
+            if message.msg_style == PAM_PROMPT_ECHO_OFF:
+                dst = <char *>malloc(data.length + 1)
+                if dst is NULL:
+                    _free_responses(response, n_messages)
+                    p_response[0] = NULL
+                    return PAM_BUF_ERR
+                memcpy(dst, data.password, data.length + 1)
+                response[i].resp = dst
+                response[i].resp_retcode = 0
+    except BaseException:
+        # an unraisable exception would make the callback return 0, which
+        # is PAM_SUCCESS; fail the conversation instead
+        _free_responses(response, n_messages)
+        p_response[0] = NULL
+        return PAM_CONV_ERR
+
+    # only hand the responses over once all of them are complete
+    p_response[0] = response
+    return PAM_SUCCESS
+
+
+def authenticate(bytes username, bytes password, bytes service, bytes tty,
+                 bint resetcreds=True):
+    """username and password authentication for the given service.
+
+    Arguments must already be encoded and free of NUL bytes, tty may be None.
+
+    Returns:
+      (code, reason, messages) with reason and messages as bytes
+    """
+    cdef list messages = []
+    cdef conv_data data
+    cdef pam_conv conv
+    cdef pam_handle_t *handle = NULL
+    cdef const char *c_username = username
+    cdef const char *c_service = service
+    cdef const char *c_tty = NULL
+    cdef const char *c_reason
+    cdef int retval
+
+    if tty is not None:
+        c_tty = tty
+
+    data.password = password
+    data.length = len(password)
+    data.messages = <void *>messages
+
+    conv.conv = _conv_cb
+    conv.appdata_ptr = &data
+
+    # modules may block on the network (LDAP, Kerberos, SSSD), let other
+    # threads run in the meantime; the bytes arguments keep the buffers alive
+    with nogil:
+        retval = pam_start(c_service, c_username, &conv, &handle)
+
+    if retval != PAM_SUCCESS:
+        # This is not an authentication error, something has gone wrong
+        # starting up PAM
+        return (retval, b'pam_start() failed: ' + pam_strerror(handle, retval),
+                messages)
+
+    with nogil:
+        if c_tty is not NULL:
+            pam_set_item(handle, PAM_TTY, c_tty)
+            pam_set_item(handle, PAM_XDISPLAY, c_tty)
+
+        retval = pam_authenticate(handle, 0)
+
+        if retval == PAM_SUCCESS:
+            retval = pam_acct_mgmt(handle, 0)
+
+        if retval == PAM_SUCCESS and resetcreds:
+            retval = pam_setcred(handle, PAM_REINITIALIZE_CRED)
+
+        c_reason = pam_strerror(handle, retval)
+
+    reason = <bytes>c_reason
+
+    with nogil:
+        pam_end(handle, retval)
+
+    return (retval, reason, messages)
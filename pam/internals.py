@@ -1,21 +1,30 @@
 import os
-import six
-import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 from ctypes import CFUNCTYPE
 from ctypes import CDLL
 from ctypes import POINTER
 from ctypes import Structure
-from ctypes import byref
+from ctypes import addressof
 from ctypes import cast
 from ctypes import sizeof
-from ctypes import c_char
 from ctypes import c_char_p
 from ctypes import c_int
 from ctypes import c_size_t
 from ctypes import c_void_p
-from ctypes import memmove
+from ctypes import create_string_buffer
+from ctypes import memset
+from ctypes import pointer
+from ctypes import py_object
 from ctypes.util import find_library
 
+try:
+    from . import _pam_fast
+except ImportError:
+    # the optional Cython extension isn't built, use ctypes only
+    _pam_fast = None
+
 PAM_ABORT = 26  # pragma: no cover
 PAM_ACCT_EXPIRED = 13  # pragma: no cover
 PAM_AUTHINFO_UNAVAIL = 9  # pragma: no cover
@@ -113,6 +122,8 @@ class PamResponse(Structure):
         return "<PamResponse %i '%s'>" % (self.resp_retcode, self.resp)
 
 
+_SIZEOF_PAMRESPONSE = sizeof(PamResponse)
+
 conv_func = CFUNCTYPE(c_int,
                       c_int,
                       POINTER(POINTER(PamMessage)),
@@ -125,97 +136,191 @@ class PamConv(Structure):
     _fields_ = [("conv", conv_func), ("appdata_ptr", c_void_p)]  # pragma: no cover
 
 
-class PamAuthenticator:
-    code = 0
-    reason = None
+_DEFAULT_SERVICE = b'login'
+_DEFAULT_ENCODING = 'utf-8'
+
+
+def _prototype(lib, name, restype, argtypes):
+    """bind the ctypes prototype of a library symbol, once per process"""
+    func = getattr(lib, name)
+    func.restype = restype
+    func.argtypes = argtypes
+    return func
+
+
+# find_library() shells out to ldconfig/gcc, so resolve the libraries and
+# their prototypes once per process instead of once per PamAuthenticator
+_LIBC = CDLL(find_library("c"), use_errno=True)
+_LIBPAM = CDLL(find_library("pam"), use_errno=True)
+_LIBPAM_MISC = CDLL(find_library("pam_misc"), use_errno=True)
+
+_PROTOS = {
+    'calloc': _prototype(_LIBC, 'calloc', c_void_p, [c_size_t, c_size_t]),
+    'malloc': _prototype(_LIBC, 'malloc', c_void_p, [c_size_t]),
+    'memcpy': _prototype(_LIBC, 'memcpy', c_void_p,
+                         [c_void_p, c_void_p, c_size_t]),
+    'pam_start': _prototype(_LIBPAM, 'pam_start', c_int,
+                            [c_char_p, c_char_p, POINTER(PamConv),
+                             POINTER(PamHandle)]),
+    'pam_acct_mgmt': _prototype(_LIBPAM, 'pam_acct_mgmt', c_int,
+                                [PamHandle, c_int]),
+    'pam_set_item': _prototype(_LIBPAM, 'pam_set_item', c_int,
+                               [PamHandle, c_int, c_void_p]),
+    'pam_setcred': _prototype(_LIBPAM, 'pam_setcred', c_int,
+                              [PamHandle, c_int]),
+    'pam_strerror': _prototype(_LIBPAM, 'pam_strerror', c_char_p,
+                               [PamHandle, c_int]),
+    'pam_authenticate': _prototype(_LIBPAM, 'pam_authenticate', c_int,
+                                   [PamHandle, c_int]),
+    'pam_open_session': _prototype(_LIBPAM, 'pam_open_session', c_int,
+                                   [PamHandle, c_int]),
+    'pam_close_session': _prototype(_LIBPAM, 'pam_close_session', c_int,
+                                    [PamHandle, c_int]),
+    'pam_putenv': _prototype(_LIBPAM, 'pam_putenv', c_int,
+                             [PamHandle, c_char_p]),
+    'pam_getenv': _prototype(_LIBPAM, 'pam_getenv', c_char_p,
+                             [PamHandle, c_char_p]),
+    'pam_getenvlist': _prototype(_LIBPAM, 'pam_getenvlist', POINTER(c_char_p),
+                                 [PamHandle]),
+}
+
+# bug #6 (@NIPE-SYSTEMS), some libpam versions don't include this function
+_HAS_PAM_END = hasattr(_LIBPAM, 'pam_end')
+
+if _HAS_PAM_END:
+    _PROTOS['pam_end'] = _prototype(_LIBPAM, 'pam_end', c_int,
+                                    [PamHandle, c_int])
+
+# unlike memset(), explicit_bzero() is guaranteed to not be optimized away
+if hasattr(_LIBC, 'explicit_bzero'):
+    _PROTOS['explicit_bzero'] = _prototype(_LIBC, 'explicit_bzero', None,
+                                           [c_void_p, c_size_t])
+else:  # pragma: no cover
+    # glibc < 2.25; a memset() through ctypes can't be optimized away either
+    def _explicit_bzero(buf, length):
+        memset(buf, 0, length)
+
+    _PROTOS['explicit_bzero'] = _explicit_bzero
+
+if _LIBPAM_MISC._name:
+    _PROTOS['pam_misc_setenv'] = _prototype(_LIBPAM_MISC, 'pam_misc_setenv',
+                                            c_int,
+                                            [PamHandle, c_char_p, c_char_p,
+                                             c_int])
+
+
+def _conv_impl(n_messages, messages, p_response, app_data):
+    """Simple conversation function that responds to any
+       prompt where the echo is off with the supplied password"""
+    _, src, length, encoding, stored_messages = cast(
+        app_data, POINTER(py_object)).contents.value
+
+    # Create an array of n_messages response objects
+    addr = _PROTOS['calloc'](n_messages, _SIZEOF_PAMRESPONSE)
+    response = cast(addr, POINTER(PamResponse))
+    p_response[0] = response
+
+    # view the messages as one array and dereference each entry only once
+    message_array = cast(messages,
+                         POINTER(POINTER(PamMessage) * n_messages)).contents
+
+    for i, p_message in enumerate(message_array):
+        pam_message = p_message.contents
+        message = pam_message.msg.decode(encoding)
+
+        stored_messages.append(message)
+
+        if pam_message.msg_style == PAM_PROMPT_ECHO_OFF:
+            # PAM frees resp, so it must come from malloc(); only the
+            # response array needs zeroing, the password copy includes
+            # the trailing NUL
+            dst = _PROTOS['malloc'](length+1)
+            _PROTOS['memcpy'](dst, src, length+1)
+            response[i].resp = dst
+            response[i].resp_retcode = 0
+
+    return PAM_SUCCESS
+
+
+def _conv_fast_impl(n_messages, messages, p_response, app_data):
+    """Conversation function for the single echo-off prompt that the
+       common stacks (pam_unix) send, anything else goes to _conv_impl"""
+    if n_messages != 1:
+        return _conv_impl(n_messages, messages, p_response, app_data)
+
+    pam_message = messages[0].contents
+    if pam_message.msg_style != PAM_PROMPT_ECHO_OFF:
+        return _conv_impl(n_messages, messages, p_response, app_data)
+
+    _, src, length, encoding, stored_messages = cast(
+        app_data, POINTER(py_object)).contents.value
+
+    stored_messages.append(pam_message.msg.decode(encoding))
+
+    # resp_retcode is already 0 from calloc()
+    response = cast(_PROTOS['calloc'](1, _SIZEOF_PAMRESPONSE),
+                    POINTER(PamResponse))
+    dst = _PROTOS['malloc'](length+1)
+    _PROTOS['memcpy'](dst, src, length+1)
+    response[0].resp = dst
+    p_response[0] = response
+
+    return PAM_SUCCESS
+
+
+# a single libffi closure shared by every authentication; the per-call state
+# is handed over through appdata_ptr
+_CONV = conv_func(_conv_fast_impl)
 
-    def __init__(self):
-        libc = CDLL(find_library("c"))
-        libpam = CDLL(find_library("pam"))
-        libpam_misc = CDLL(find_library("pam_misc"))
 
+class PamAuthenticator:
+    def __init__(self):
+        self.code = 0
+        self.reason = None
         self.handle = None
         self.messages = []
+        self._conv_data = None
+        self._handle = PamHandle()
+        self._conv = PamConv(_CONV, 0)
+        self._phandle = pointer(self._handle)
+        self._pconv = pointer(self._conv)
+
+        self.libc = _LIBC
+        self.libpam = _LIBPAM
 
-        self.calloc = libc.calloc
-        self.calloc.restype = c_void_p
-        self.calloc.argtypes = [c_size_t, c_size_t]
-
-        # bug #6 (@NIPE-SYSTEMS), some libpam versions don't include this
-        # function
-        if hasattr(libpam, 'pam_end'):
-            self.pam_end = libpam.pam_end
-            self.pam_end.restype = c_int
-            self.pam_end.argtypes = [PamHandle, c_int]
-
-        self.pam_start = libpam.pam_start
-        self.pam_start.restype = c_int
-        self.pam_start.argtypes = [c_char_p, c_char_p, POINTER(PamConv),
-                                   POINTER(PamHandle)]
-
-        self.pam_acct_mgmt = libpam.pam_acct_mgmt
-        self.pam_acct_mgmt.restype = c_int
-        self.pam_acct_mgmt.argtypes = [PamHandle, c_int]
-
-        self.pam_set_item = libpam.pam_set_item
-        self.pam_set_item.restype = c_int
-        self.pam_set_item.argtypes = [PamHandle, c_int, c_void_p]
-
-        self.pam_setcred = libpam.pam_setcred
-        self.pam_strerror = libpam.pam_strerror
-        self.pam_strerror.restype = c_char_p
-        self.pam_strerror.argtypes = [PamHandle, c_int]
-
-        self.pam_authenticate = libpam.pam_authenticate
-        self.pam_authenticate.restype = c_int
-        self.pam_authenticate.argtypes = [PamHandle, c_int]
-
-        self.pam_open_session = libpam.pam_open_session
-        self.pam_open_session.restype = c_int
-        self.pam_open_session.argtypes = [PamHandle, c_int]
-
-        self.pam_close_session = libpam.pam_close_session
-        self.pam_close_session.restype = c_int
-        self.pam_close_session.argtypes = [PamHandle, c_int]
-
-        self.pam_putenv = libpam.pam_putenv
-        self.pam_putenv.restype = c_int
-        self.pam_putenv.argtypes = [PamHandle, c_char_p]
-
-        if libpam_misc._name:
-            self.pam_misc_setenv = libpam_misc.pam_misc_setenv
-            self.pam_misc_setenv.restype = c_int
-            self.pam_misc_setenv.argtypes = [PamHandle, c_char_p, c_char_p,
-                                             c_int]
-
-        self.pam_getenv = libpam.pam_getenv
-        self.pam_getenv.restype = c_char_p
-        self.pam_getenv.argtypes = [PamHandle, c_char_p]
-
-        self.pam_getenvlist = libpam.pam_getenvlist
-        self.pam_getenvlist.restype = POINTER(c_char_p)
-        self.pam_getenvlist.argtypes = [PamHandle]
+        self.calloc = _PROTOS['calloc']
+
+        if _HAS_PAM_END:
+            self.pam_end = _PROTOS['pam_end']
+
+        self.pam_start = _PROTOS['pam_start']
+        self.pam_acct_mgmt = _PROTOS['pam_acct_mgmt']
+        self.pam_set_item = _PROTOS['pam_set_item']
+        self.pam_setcred = _PROTOS['pam_setcred']
+        self.pam_strerror = _PROTOS['pam_strerror']
+        self.pam_authenticate = _PROTOS['pam_authenticate']
+        self.pam_open_session = _PROTOS['pam_open_session']
+        self.pam_close_session = _PROTOS['pam_close_session']
+        self.pam_putenv = _PROTOS['pam_putenv']
+
+        if 'pam_misc_setenv' in _PROTOS:
+            self.pam_misc_setenv = _PROTOS['pam_misc_setenv']
+
+        self.pam_getenv = _PROTOS['pam_getenv']
+        self.pam_getenvlist = _PROTOS['pam_getenvlist']
 
     def authenticate(
                 self,
-                username,
-                password,
-                service='login',
-                env=None,
-                call_end=True,
-                encoding='utf-8',
-                resetcreds=True):
-        self.pam_authenticate.__annotations = {'username': str,
-                                               'password': str,
-                                               'service': str,
-                                               'env': dict,
-                                               'call_end': bool,
-                                               'encoding': str,
-                                               'resetcreds': bool,
-                                               'return': bool}
+                username: str,
+                password: str,
+                service: str = 'login',
+                env: Optional[dict] = None,
+                call_end: bool = True,
+                encoding: str = 'utf-8',
+                resetcreds: bool = True) -> int:
         """username and password authentication for the given service.
 
-        Returns True for success, or False for failure.
+        Returns the Linux-PAM return value, PAM_SUCCESS (0) for success.
 
         self.code (integer) and self.reason (string) are always stored and may
         be referenced for the reason why authentication failed. 0/'Success'
@@ -232,39 +337,16 @@ class PamAuthenticator:
           call_end: call the pam_end() function after (default true)
 
         Returns:
-          success:  True
-          failure:  False
+          Linux-PAM return value as int
         """
 
-        @conv_func
-        def my_conv(n_messages, messages, p_response, app_data):
-            """Simple conversation function that responds to any
-               prompt where the echo is off with the supplied password"""
-            # Create an array of n_messages response objects
-            addr = self.calloc(n_messages, sizeof(PamResponse))
-            response = cast(addr, POINTER(PamResponse))
-            p_response[0] = response
-
-            for i in range(n_messages):
-                message = messages[i].contents.msg
-                if sys.version_info >= (3,):
-                    message = message.decode(encoding)
-
-                self.messages.append(message)
-
-                if messages[i].contents.msg_style == PAM_PROMPT_ECHO_OFF:
-                    dst = self.calloc(len(password)+1, sizeof(c_char))
-                    memmove(dst, cpassword, len(password))
-                    response[i].resp = dst
-                    response[i].resp_retcode = 0
-
-            return PAM_SUCCESS
-
-        if isinstance(username, six.text_type):
+        if isinstance(username, str):
             username = username.encode(encoding)
-        if isinstance(password, six.text_type):
+        if isinstance(password, str):
             password = password.encode(encoding)
-        if isinstance(service, six.text_type):
+        if service == 'login' and encoding == _DEFAULT_ENCODING:
+            service = _DEFAULT_SERVICE
+        elif isinstance(service, str):
             service = service.encode(encoding)
 
         if b'\x00' in username or b'\x00' in password or b'\x00' in service:
@@ -273,23 +355,6 @@ class PamAuthenticator:
                            ' NUL')
             raise ValueError(self.reason)
 
-        # do this up front so we can safely throw an exception if there's
-        # anything wrong with it
-        cpassword = c_char_p(password)
-
-        self.handle = PamHandle()
-        conv = PamConv(my_conv, 0)
-        retval = self.pam_start(service, username, byref(conv),
-                                byref(self.handle))
-
-        if retval != PAM_SUCCESS:  # pragma: no cover
-            # This is not an authentication error, something has gone wrong
-            # starting up PAM
-            self.code = retval
-            self.reason = ("pam_start() failed: %s" %
-                           self.pam_strerror(self.handle, retval))
-            return retval
-
         # set the TTY, required when pam_securetty is used and the username
         # root is used note: this is only needed WHEN the pam_securetty.so
         # module is used; for checking /etc/securetty for allowing root
@@ -304,64 +369,193 @@ class PamAuthenticator:
         # if X $DISPLAY is set, use it - otherwise if we have a STDIN tty,
         # get it
 
-        ctty = os.environ.get('DISPLAY')
+        # environb and fsencode() hand us the raw bytes of the OS without
+        # a decode/encode round trip
+        ctty = os.environb.get(b'DISPLAY')
         if not ctty and os.isatty(0):
-            ctty = os.ttyname(0)
+            ctty = os.fsencode(os.ttyname(0))
+
+        if not ctty:
+            ctty = None
+
+        # end the transaction a previous call_end=False run left open, which
+        # also scrubs its password, before the structures are reused
+        if self.handle:
+            self.end()
+            # the caller may still hold the old handle, don't zero it under
+            # their feet
+            self._handle = PamHandle()
+            self._phandle = pointer(self._handle)
+        self._clear_conv_data()
+        self.handle = None
 
-        if ctty:
-            ctty = c_char_p(ctty.encode(encoding))
+        if _pam_fast is not None and call_end and not env:
+            # nothing needs the handle afterwards, run the whole
+            # transaction in the compiled helper
+            self.code, reason, messages = _pam_fast.authenticate(
+                username, password, service, ctty, resetcreds)
+            self.messages.extend(message.decode(encoding)
+                                 for message in messages)
+            self.reason = reason.decode(encoding)
+            return self.code
+
+        # copy the password into memory we own, so it can be scrubbed once
+        # PAM is done with it
+        cpassword = create_string_buffer(password)
+
+        # the conversation data has to outlive this call for as long as the
+        # handle is open, so keep it on the instance
+        # the buffer address and length are fixed, so the callback doesn't
+        # have to convert the buffer on every prompt
+        self._conv_data = py_object((cpassword, addressof(cpassword),
+                                     len(password), encoding, self.messages))
+
+        # authentication is serial per instance, so reuse the structures
+        self._handle.handle = 0
+        self._conv.appdata_ptr = addressof(self._conv_data)
+
+        self.handle = self._handle
+        retval = self.pam_start(service, username, self._pconv,
+                                self._phandle)
 
-            retval = self.pam_set_item(self.handle, PAM_TTY, ctty)
-            retval = self.pam_set_item(self.handle, PAM_XDISPLAY, ctty)
+        if retval != PAM_SUCCESS:  # pragma: no cover
+            # This is not an authentication error, something has gone wrong
+            # starting up PAM
+            self.code = retval
+            self.reason = ("pam_start() failed: %s" %
+                           self.pam_strerror(self.handle, retval))
+            self._clear_conv_data()
+            return retval
 
-        # Set the environment variables if they were supplied
-        if env:
-            if not isinstance(env, dict):
-                raise TypeError('"env" must be a dict')
+        # scrub the password and drop the handle if we bail out halfway;
+        # on success with call_end=False the conversation may still run
+        try:
+            if ctty:
+                ctty = c_char_p(ctty)
 
-            for key, value in env.items():
-                if isinstance(key, bytes) and b'\x00' in key:
-                    raise ValueError('"env{}" key cannot contain NULLs')
-                if isinstance(value, bytes) and b'\x00' in value:
-                    raise ValueError('"env{}" value cannot contain NULLs')
+                retval = self.pam_set_item(self.handle, PAM_TTY, ctty)
+                retval = self.pam_set_item(self.handle, PAM_XDISPLAY, ctty)
 
-                name_value = "{}={}".format(key, value)
-                retval = self.putenv(name_value, encoding)
+            # Set the environment variables if they were supplied
+            if env:
+                if not isinstance(env, dict):
+                    raise TypeError('"env" must be a dict')
 
-        auth_success = self.pam_authenticate(self.handle, 0)
-        print(f'as1: {auth_success}')
+                for key, value in env.items():
+                    if isinstance(key, bytes) and b'\x00' in key:
+                        raise ValueError('"env{}" key cannot contain NULLs')
+                    if isinstance(value, bytes) and b'\x00' in value:
+                        raise ValueError('"env{}" value cannot contain NULLs')
 
-        if auth_success == PAM_SUCCESS:
-            auth_success = self.pam_acct_mgmt(self.handle, 0)
-        print(f'as2: {auth_success}')
+                    name_value = "{}={}".format(key, value)
+                    retval = self.putenv(name_value, encoding)
 
-        if auth_success == PAM_SUCCESS and resetcreds:
-            auth_success = self.pam_setcred(self.handle, PAM_REINITIALIZE_CRED)
-        print(f'as3: {auth_success}')
+            auth_success = self.pam_authenticate(self.handle, 0)
+            print(f'as1: {auth_success}')
 
-        # store information to inform the caller why we failed
-        self.code = auth_success
-        self.reason = self.pam_strerror(self.handle, auth_success)
+            if auth_success == PAM_SUCCESS:
+                auth_success = self.pam_acct_mgmt(self.handle, 0)
+            print(f'as2: {auth_success}')
+
+            if auth_success == PAM_SUCCESS and resetcreds:
+                auth_success = self.pam_setcred(self.handle,
+                                                PAM_REINITIALIZE_CRED)
+            print(f'as3: {auth_success}')
+
+            # store information to inform the caller why we failed
+            self.code = auth_success
+            self.reason = self.pam_strerror(self.handle, auth_success)
 
-        if sys.version_info >= (3,):
             self.reason = self.reason.decode(encoding)
 
-        if call_end and hasattr(self, 'pam_end'):
-            self.pam_end(self.handle, auth_success)
+            if call_end:
+                self._end_or_scrub(auth_success)
+
+            return auth_success
+        except BaseException:
+            self._end_or_scrub(PAM_SYSTEM_ERR)
+            raise
+
+    @staticmethod
+    def authenticate_many(
+                creds: list,
+                service: str = 'login',
+                encoding: str = 'utf-8',
+                workers: int = 4) -> list:
+        """authenticate a batch of credentials for the given service.
+
+        The credentials are checked in parallel, each worker thread reuses
+        its own PamAuthenticator; code, reason and messages of the instance
+        this is called on (if any) are left untouched.  libpam runs without the GIL (ctypes
+        releases it around foreign calls, the compiled fast path does so
+        explicitly), so slow PAM backends overlap.
+
+        A credential containing NUL doesn't abort the batch, its entry is
+        PAM_SYSTEM_ERR just like the code authenticate() stores for it.
+
+        Args:
+          creds:    list (or any iterable) of (username, password) pairs
+          service:  PAM service to authenticate against, defaults to 'login'
+          encoding: encoding used for str usernames and passwords
+          workers:  number of worker threads
+
+        Returns:
+          list of Linux-PAM return values, in the order of creds
+        """
+        local = threading.local()
+
+        def worker(cred):
+            try:
+                pam = local.pam
+            except AttributeError:
+                pam = local.pam = PamAuthenticator()
+
+            # only the current credential's prompts are of interest
+            pam.messages.clear()
+
+            username, password = cred
+            try:
+                return pam.authenticate(username, password, service=service,
+                                        encoding=encoding)
+            except ValueError:
+                return PAM_SYSTEM_ERR
+
+        with ThreadPoolExecutor(workers) as executor:
+            return list(executor.map(worker, creds))
+
+    def _end_or_scrub(self, status):
+        """End the handle and drop its conversation data; without pam_end()
+        the handle stays open and may still call the conversation, so only
+        the password is scrubbed and the data is kept alive"""
+        if _HAS_PAM_END:
+            self.pam_end(self.handle, status)
             self.handle = None
+            self._clear_conv_data()
+        else:
+            self._scrub_password()
 
-        return auth_success
+    def _scrub_password(self):
+        """Scrub our copy of the password"""
+        if self._conv_data is not None:
+            _, address, length = self._conv_data.value[:3]
+            _PROTOS['explicit_bzero'](address, length)
+
+    def _clear_conv_data(self):
+        """Scrub our copy of the password once PAM can't ask for it"""
+        self._scrub_password()
+        self._conv_data = None
 
     def end(self):
         """A direct call to pam_end()
         Returns:
           Linux-PAM return value as int
         """
-        if not self.handle or not hasattr(self, 'pam_end'):
+        if not self.handle or not _HAS_PAM_END:
             return PAM_SYSTEM_ERR
 
         retval = self.pam_end(self.handle, self.code)
         self.handle = None
+        self._clear_conv_data()
 
         return retval
 
@@ -377,8 +571,7 @@ class PamAuthenticator:
         self.code = retval
         self.reason = self.pam_strerror(self.handle, retval)
 
-        if sys.version_info >= (3,):
-            self.reason = self.reason.decode(encoding)
+        self.reason = self.reason.decode(encoding)
 
         return retval
 
@@ -394,8 +587,7 @@ class PamAuthenticator:
         self.code = retval
         self.reason = self.pam_strerror(self.handle, retval)
 
-        if sys.version_info >= (3,):
-            self.reason = self.reason.decode(encoding)
+        self.reason = self.reason.decode(encoding)
 
         return retval
 
@@ -444,9 +636,8 @@ class PamAuthenticator:
         if not self.handle:
             return PAM_SYSTEM_ERR
 
-        if sys.version_info >= (3, ):
-            if isinstance(key, six.text_type):
-                key = key.encode(encoding)
+        if isinstance(key, str):
+            key = key.encode(encoding)
 
         value = self.pam_getenv(self.handle, key)
 
@@ -456,8 +647,7 @@ class PamAuthenticator:
         if isinstance(value, int):  # pragma: no cover
             raise Exception(self.pam_strerror(self.handle, value))
 
-        if sys.version_info >= (3,):
-            value = value.decode(encoding)
+        value = value.decode(encoding)
 
         return value
 
@@ -485,8 +675,7 @@ class PamAuthenticator:
                 break
 
             env_item = item
-            if sys.version_info >= (3,):
-                env_item = env_item.decode(encoding)
+            env_item = env_item.decode(encoding)
 
             try:
                 pam_key, pam_value = env_item.split("=", 1)
@@ -23,11 +23,11 @@ PAM module for python
 Provides an authenticate function that will allow the caller to authenticate
 a user against the Pluggable Authentication Modules (PAM) on the system.
 
-Implemented using ctypes, so no compilation is necessary.
+Implemented using ctypes, so no compilation is necessary.  If Cython is
+available at install time an optional extension is built which runs the
+common authentication path without the ctypes overhead.
 '''
 
-import six
-
 from . import internals
 
 __all__ = ['pam']
@@ -50,7 +50,7 @@ if __name__ == "__main__":  # pragma: no cover
             readline.redisplay()
 
         readline.set_pre_input_hook(hook)
-        result = six.input(prompt)  # nosec (bandit; python2)
+        result = input(prompt)
 
         readline.set_pre_input_hook()
 
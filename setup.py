@@ -1,6 +1,22 @@
 import os
 from setuptools import setup
 from setuptools import find_packages
+from setuptools import Extension
+
+try:
+    from Cython.Build import cythonize
+except ImportError:
+    # without Cython only the pure ctypes implementation is installed
+    ext_modules = []
+else:
+    ext_modules = cythonize([Extension('pam._pam_fast',
+                                       ['pam/_pam_fast.pyx'],
+                                       libraries=['pam'])])
+
+    # without the libpam headers the build falls back to ctypes; cythonize()
+    # doesn't carry the flag over, so set it on the extensions it returns
+    for ext in ext_modules:
+        ext.optional = True
 
 
 def read(fname):
@@ -14,6 +30,7 @@ setup(name             = 'python-pam',
       long_description = read('README.md'),
       long_description_content_type='text/markdown',
       packages         = find_packages(exclude=['tests']),
+      ext_modules      = ext_modules,
       version          = '2.0.0rc1',
       author           = 'David Ford',
       author_email     = 'david@blue-labs.org',
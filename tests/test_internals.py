@@ -3,6 +3,7 @@ import pytest
 
 from ctypes import c_void_p
 
+import pam.internals
 from pam.internals import PAM_SYSTEM_ERR
 from pam.internals import PAM_SUCCESS
 from pam.internals import PAM_SESSION_ERR
@@ -20,12 +21,24 @@ TEST_USERNAME = os.getenv('USERNAME', '')
 TEST_PASSWORD = os.getenv('PASSWORD', '')
 
 
+requires_fast = pytest.mark.skipif(pam.internals._pam_fast is None,
+                                   reason='pam._pam_fast is not built')
+
+
 @pytest.fixture
 def pam_obj(request):
     obj = PamAuthenticator()
     yield obj
 
 
+@pytest.fixture(params=[pytest.param('fast', marks=requires_fast), 'ctypes'])
+def pam_path(request, monkeypatch):
+    """run a test against the compiled fast path and the ctypes code"""
+    if request.param == 'ctypes':
+        monkeypatch.setattr(pam.internals, '_pam_fast', None)
+    yield request.param
+
+
 def test_PamHandle__void0():
     x = PamHandle()
     assert x.handle == c_void_p(0).value
@@ -90,6 +103,58 @@ def test_PamAuthenticator__normal_unknown_username(pam_obj):
     assert PAM_AUTH_ERR == rv
 
 
+def test_PamAuthenticator__password_wiped_on_end(pam_obj):
+    pam_obj.authenticate(TEST_USERNAME, TEST_PASSWORD, call_end=False)
+    cpassword = pam_obj._conv_data.value[0]
+    pam_obj.end()
+    assert pam_obj._conv_data is None
+    assert not any(cpassword.raw)
+
+
+def test_PamAuthenticator__authenticate_many(pam_obj):
+    rv = pam_obj.authenticate_many([(TEST_USERNAME, TEST_PASSWORD),
+                                    ('bad_user_name', ''),
+                                    (b'username\x00', b'password'),
+                                    (TEST_USERNAME, TEST_PASSWORD)])
+    assert [PAM_SUCCESS, PAM_AUTH_ERR, PAM_SYSTEM_ERR, PAM_SUCCESS] == rv
+
+
+@requires_fast
+@pytest.mark.parametrize('password', [TEST_PASSWORD, ''])
+def test_PamAuthenticator__fast_path_matches_ctypes(monkeypatch, password):
+    fast = PamAuthenticator()
+    fast.authenticate(TEST_USERNAME, password)
+    monkeypatch.setattr(pam.internals, '_pam_fast', None)
+    ctypes = PamAuthenticator()
+    ctypes.authenticate(TEST_USERNAME, password)
+    assert ctypes.code == fast.code
+    assert ctypes.reason == fast.reason
+    assert ctypes.messages == fast.messages
+
+
+def test_PamAuthenticator__call_end_false_state_reset(pam_path, pam_obj):
+    pam_obj.authenticate(TEST_USERNAME, TEST_PASSWORD, call_end=False)
+    cpassword = pam_obj._conv_data.value[0]
+    old_handle = pam_obj.handle
+    open_handle = old_handle.handle
+
+    ended = []
+    pam_end = pam_obj.pam_end
+
+    def record_pam_end(handle, status):
+        ended.append(handle.handle)
+        return pam_end(handle, status)
+
+    pam_obj.pam_end = record_pam_end
+    rv = pam_obj.authenticate(TEST_USERNAME, TEST_PASSWORD)
+    assert PAM_SUCCESS == rv
+    assert open_handle == ended[0]
+    assert open_handle == old_handle.handle
+    assert pam_obj.handle is None
+    assert pam_obj._conv_data is None
+    assert not any(cpassword.raw)
+
+
 def test_PamAuthenticator__unset_DISPLAY(pam_obj):
     os.environ['DISPLAY'] = ''
     rv = pam_obj.authenticate(TEST_USERNAME, TEST_PASSWORD)
@@ -101,6 +166,33 @@ def test_PamAuthenticator__env_requires_dict(pam_obj):
         pam_obj.authenticate(TEST_USERNAME, TEST_PASSWORD, env='value')
 
 
+def test_PamAuthenticator__env_error_wipes_password(pam_obj, monkeypatch):
+    buffers = []
+    orig_create_string_buffer = pam.internals.create_string_buffer
+
+    def create_string_buffer(init):
+        buffers.append(orig_create_string_buffer(init))
+        return buffers[-1]
+
+    monkeypatch.setattr(pam.internals, 'create_string_buffer',
+                        create_string_buffer)
+    with pytest.raises(TypeError):
+        pam_obj.authenticate(TEST_USERNAME, TEST_PASSWORD, env=['x'])
+    assert pam_obj.handle is None
+    assert pam_obj._conv_data is None
+    assert not any(buffers[0].raw)
+
+
+def test_PamAuthenticator__no_pam_end_keeps_conv_data(pam_obj, monkeypatch):
+    monkeypatch.setattr(pam.internals, '_pam_fast', None)
+    monkeypatch.setattr(pam.internals, '_HAS_PAM_END', False)
+    pam_obj.authenticate(TEST_USERNAME, TEST_PASSWORD)
+    # the handle is still open, so its conversation data must stay alive
+    assert pam_obj.handle is not None
+    assert pam_obj._conv_data is not None
+    assert not any(pam_obj._conv_data.value[0].raw)
+
+
 def test_PamAuthenticator__env_requires_key_no_nulls(pam_obj):
     with pytest.raises(ValueError):
         pam_obj.authenticate(TEST_USERNAME, TEST_PASSWORD, env={b'\x00invalid_key': b'value'})